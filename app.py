@@ -1,12 +1,14 @@
 import os
 import logging
+from threading import Lock
+from cachetools import TTLCache
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime
 
 # Import your existing SEO analysis code
-from seo_analyzer import SEOAnalyzer, initialize_nltk
+from seo_analyzer import analyzer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -17,9 +19,9 @@ app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 app.wsgi_app = ProxyFix(app.wsgi_app)  # Handle proxy headers
 
-# Initialize NLTK resources
-initialize_nltk()
-analyzer = SEOAnalyzer()
+# Recent analyses by URL, shared by the threads of this worker
+analysis_cache = TTLCache(maxsize=1024, ttl=600)
+analysis_cache_lock = Lock()
 
 @app.route('/analyze', methods=['POST'])
 def analyze_url():
@@ -39,9 +41,17 @@ def analyze_url():
                 }
             }), 400
         
-        # Perform SEO analysis
+        # Perform SEO analysis, reusing a recent result unless ?nocache=1 is passed
         try:
-            analysis = analyzer.analyze_url(url)
+            analysis = None
+            if request.args.get('nocache') != '1':
+                with analysis_cache_lock:
+                    analysis = analysis_cache.get(url)
+            if analysis is None:
+                analysis = analyzer.analyze_url(url)
+                if 'error' not in analysis:
+                    with analysis_cache_lock:
+                        analysis_cache[url] = analysis
         except Exception as analysis_error:
             logger.error(f"Analysis failed for {url}: {analysis_error}")
             return jsonify({
@@ -52,6 +62,16 @@ def analyze_url():
                 }
             }), 500
         
+        if 'error' in analysis:
+            logger.error(f"Analysis failed for {url}: {analysis['error']}")
+            return jsonify({
+                "error": analysis['error'],
+                "metadata": {
+                    "analyzedAt": start_time.isoformat(),
+                    "analysisDuration": 0
+                }
+            }), 500
+        
         # Calculate analysis duration
         end_time = datetime.now()
         analysis_duration = (end_time - start_time).total_seconds()
@@ -60,23 +80,23 @@ def analyze_url():
         response = {
             "keywords": analysis.get('keywords', []),
             "content": {
-                "readabilityScore": analysis['content_stats']['readability_score'],
-                "readabilityInterpretation": _interpret_readability(analysis['content_stats']['readability_score']),
-                "wordCount": analysis['content_stats']['word_count']
+                "readabilityScore": analysis['content']['readabilityScore'],
+                "readabilityInterpretation": _interpret_readability(analysis['content']['readabilityScore']),
+                "wordCount": analysis['content']['wordCount']
             },
             "technical": {
-                "mobileFriendly": analysis['technical_stats']['mobile_friendly'],
-                "ssl": analysis['technical_stats']['ssl_certificate'],
-                "structuredData": False  # Add your structured data check
+                "mobileFriendly": analysis['technical']['mobileFriendly'],
+                "ssl": analysis['technical']['ssl'],
+                "structuredData": analysis['technical']['structuredData']
             },
             "links": {
-                "internalCount": len(analysis['link_stats']['internal_links']),
-                "externalCount": len(analysis['link_stats']['external_links']),
-                "totalCount": len(analysis['link_stats']['internal_links']) + len(analysis['link_stats']['external_links'])
+                "internalCount": analysis['links']['internalCount'],
+                "externalCount": analysis['links']['externalCount'],
+                "totalCount": analysis['links']['totalCount']
             },
             "performance": {
-                "totalResources": len(analysis.get('resource_stats', [])),
-                "totalSize": analysis.get('total_page_size', 0)
+                "totalResources": analysis['performance']['totalResources'],
+                "totalSize": analysis['performance']['totalSize']
             },
             "metadata": {
                 "analyzedAt": start_time.isoformat(),
@@ -109,5 +129,6 @@ def _interpret_readability(score):
     else:
         return "Very Difficult"
 
+# Development server only; in production the app is served by gunicorn (see start.sh)
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=False)
@@ -1,14 +1,52 @@
+import codecs
+import functools
+import heapq
+import math
 import os
 import re
+import time
 import requests
-from bs4 import BeautifulSoup
-from collections import Counter, defaultdict
+import lxml.etree
+import lxml.html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from textstat import flesch_reading_ease
+from operator import itemgetter
 from urllib.parse import urljoin, urlparse
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import PorterStemmer
+from pyphen import Pyphen
+
+_PUNCT_RE = re.compile(r'[^\w\s]+')
+_SENTENCE_RE = re.compile(r'\b[^.!?]+[.!?]*')
+_SCHEME_RE = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*')
+_NETLOC_END_RE = re.compile(r'[/?#]')
+_SKIPPED_LINK_PREFIXES = ('javascript:', 'mailto:', 'tel:', '#')
+_TEXT_XPATH = lxml.etree.XPath(
+    '//text()[not(ancestor::script) and not(ancestor::style)]', smart_strings=False
+)
+_LINK_XPATH = lxml.etree.XPath('//a/@href', smart_strings=False)
+_TITLE_XPATH = lxml.etree.XPath('(//title)[1]/text()', smart_strings=False)
+_META_XPATH = lxml.etree.XPath('(//meta[@name=$name])[1]/@content', smart_strings=False)
+# rel is a space-separated token list, so match "canonical" as a token
+_CANONICAL_XPATH = lxml.etree.XPath(
+    "(//link[contains(concat(' ', normalize-space(@rel), ' '), ' canonical ')])[1]/@href",
+    smart_strings=False
+)
+_VIEWPORT_XPATH = lxml.etree.XPath('boolean(//meta[@name="viewport"])')
+_STRUCTURED_DATA_XPATH = lxml.etree.XPath('boolean(//script[@type="application/ld+json"])')
+_COUNTED_TAGS = (
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'strong', 'em', 'blockquote', 'img', 'script', 'link'
+)
+
+_EXTRA_STOP_WORDS = frozenset({
+    'the', 'and', 'is', 'in', 'to', 'it', 'that', 'we', 'for', 'an', 'are', 
+    'by', 'be', 'this', 'with', 'i', 'you', 'not', 'or', 'on', 'your'
+})
 
 def initialize_nltk():
     """Initialize NLTK with only required packages."""
@@ -18,57 +56,125 @@ def initialize_nltk():
         print("Downloading stopwords package...")
         nltk.download('stopwords', quiet=True)
 
+def _round_half_away(number, points=0):
+    """Round half away from zero, as textstat does for its scores."""
+    p = 10 ** points
+    return math.floor(number * p + math.copysign(0.5, number)) / p
+
+initialize_nltk()
+_STOP_WORDS = frozenset(stopwords.words('english')) | _EXTRA_STOP_WORDS
+
 class SEOAnalyzer:
     def __init__(self):
         self.stemmer = PorterStemmer()
-        self.stop_words = set(stopwords.words('english')).union({
-            'the', 'and', 'is', 'in', 'to', 'it', 'that', 'we', 'for', 'an', 'are', 
-            'by', 'be', 'this', 'with', 'i', 'you', 'not', 'or', 'on', 'your'
-        })
-        self.keyword_library = defaultdict(int)
+        self.stop_words = _STOP_WORDS
+        self._stem = functools.lru_cache(maxsize=200000)(self.stemmer.stem)
+        self.pyphen = Pyphen(lang='en_US')
+        self._syllables = functools.lru_cache(maxsize=200000)(self.count_syllables)
         self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        adapter = HTTPAdapter(
+            pool_connections=64,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._pool = ThreadPoolExecutor(max_workers=4)
         
     def clean_text(self, text):
         """Clean and normalize text without using NLTK tokenizer."""
         if not text:
             return []
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
+        text = _PUNCT_RE.sub(' ', text.lower())
         words = [word for word in text.split() if word and word not in self.stop_words and len(word) > 2]
-        return [self.stemmer.stem(word) for word in words]
+        stems = {word: self._stem(word) for word in set(words)}
+        return [stems[word] for word in words]
+
+    def count_syllables(self, word):
+        """Count syllables in a word from its hyphenation points."""
+        return len(self.pyphen.positions(word)) + 1
+
+    def flesch_reading_ease(self, text):
+        """Compute the Flesch reading ease score with textstat's rules."""
+        words = _PUNCT_RE.sub('', text.lower()).split()
+        sentences = _SENTENCE_RE.findall(text)
+        short_sentences = sum(1 for s in sentences if len(_PUNCT_RE.sub('', s).split()) <= 2)
+        sentence_count = max(1, len(sentences) - short_sentences)
+        syllable_count = sum(n * self._syllables(word) for word, n in Counter(words).items())
+
+        avg_sentence_length = _round_half_away(len(words) / sentence_count, 1)
+        avg_syllables = _round_half_away(syllable_count / len(words), 1) if words else 0.0
+        return _round_half_away(206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables, 2)
 
     def fetch_url_content(self, url):
-        """Fetch URL content with error handling and user agent."""
+        """Fetch URL content, parsing it as it downloads; returns (tree, decoded body size in bytes).
+
+        The tree is None when the decoded body is too short to analyze.
+        """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = self.session.get(url, timeout=10, headers=headers)
-            response.raise_for_status()
-            return response.text
+            with self.session.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                # Only trust an explicit charset; otherwise let libxml2 detect it from the markup
+                content_type = response.headers.get('Content-Type', '').lower()
+                encoding = response.encoding if 'charset=' in content_type else None
+                decoder = None
+                try:
+                    parser = lxml.html.HTMLParser(encoding=encoding)
+                except LookupError:
+                    # Charset unknown to libxml2 (e.g. "charset=foobar"); decode as UTF-8 with
+                    # replacement characters, as response.text does for unknown charsets
+                    parser = lxml.html.HTMLParser()
+                    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    parser.feed(decoder.decode(chunk) if decoder else chunk)
+                if decoder:
+                    tail = decoder.decode(b'', final=True)
+                    if tail:
+                        parser.feed(tail)
+                if size < 100:
+                    return None, size
+                return parser.close(), size
         except requests.exceptions.RequestException as e:
             print(f"Error fetching {url}: {e}")
-            return None
+            return None, 0
+
+    def get_text(self, tree):
+        """Extract visible page text, skipping script and style contents."""
+        strings = _TEXT_XPATH(tree)
+        return ' '.join(filter(None, map(str.strip, strings)))
 
-    def analyze_content(self, soup):
+    def count_tags(self, tree):
+        """Count every tag the analysis reports on in a single walk of the tree."""
+        return Counter(el.tag for el in tree.iter(*_COUNTED_TAGS))
+
+    def analyze_content(self, tree, text=None, tag_counts=None):
         """Analyze content quality and structure."""
-        text = soup.get_text(separator=' ', strip=True)
+        if text is None:
+            text = self.get_text(tree)
+        if tag_counts is None:
+            tag_counts = self.count_tags(tree)
         try:
-            readability = flesch_reading_ease(text)
+            readability = self.flesch_reading_ease(text)
             readability_interpretation = self.get_readability_interpretation(readability)
         except:
             readability = 0
             readability_interpretation = "Unable to calculate"
-        
+
         return {
             'readabilityScore': readability,
             'wordCount': len(text.split()),
             'readabilityInterpretation': readability_interpretation,
-            'headingDistribution': self.count_headings(soup),
+            'headingDistribution': self.count_headings(tag_counts),
             'contentTags': {
-                'strong': len(soup.find_all('strong')),
-                'em': len(soup.find_all('em')),
-                'blockquote': len(soup.find_all('blockquote')),
-                'images': len(soup.find_all('img'))
+                'strong': tag_counts['strong'],
+                'em': tag_counts['em'],
+                'blockquote': tag_counts['blockquote'],
+                'images': tag_counts['img']
             }
         }
 
@@ -81,37 +187,32 @@ class SEOAnalyzer:
         else:
             return "Needs Improvement"
 
-    def analyze_technical(self, url, soup):
+    def analyze_technical(self, url, tree):
         """Analyze technical SEO elements."""
         return {
-            'title': self.get_meta_content(soup, 'title'),
-            'metaDescription': self.get_meta_content(soup, 'description'),
-            'canonical': self.get_canonical(soup),
-            'mobileFriendly': bool(soup.find('meta', attrs={'name': 'viewport'})),
+            'title': self.get_meta_content(tree, 'title'),
+            'metaDescription': self.get_meta_content(tree, 'description'),
+            'canonical': self.get_canonical(tree),
+            'mobileFriendly': _VIEWPORT_XPATH(tree),
             'ssl': self.check_ssl(url),
-            'structuredData': bool(soup.find_all('script', type='application/ld+json'))
+            'structuredData': _STRUCTURED_DATA_XPATH(tree)
         }
 
-    def analyze_links(self, base_url, soup):
+    def analyze_links(self, base_url, tree):
         """Analyze internal and external links."""
-        links = soup.find_all('a', href=True)
-        parsed_base = urlparse(base_url)
+        base_netloc = urlparse(base_url).netloc
         
         internal_links = []
         external_links = []
         
-        for link in links:
-            href = link['href']
-            try:
-                full_url = urljoin(base_url, href)
-                parsed_href = urlparse(full_url)
-                
-                if parsed_href.netloc == parsed_base.netloc:
-                    internal_links.append(href)
-                else:
-                    external_links.append(href)
-            except:
+        for href in _LINK_XPATH(tree):
+            href = href.strip()
+            if not href or href.lower().startswith(_SKIPPED_LINK_PREFIXES):
                 continue
+            if self.is_internal_link(href, base_url, base_netloc):
+                internal_links.append(href)
+            else:
+                external_links.append(href)
                 
         return {
             'internalCount': len(internal_links),
@@ -119,31 +220,55 @@ class SEOAnalyzer:
             'totalCount': len(internal_links) + len(external_links)
         }
 
-    def get_meta_content(self, soup, meta_name):
+    def is_internal_link(self, href, base_url, base_netloc):
+        """Check whether a link stays on the base host, parsing it only when string checks can't tell."""
+        netloc = None
+        if href.startswith('//'):
+            netloc = _NETLOC_END_RE.split(href[2:], 1)[0]
+        elif not href or href.startswith(('/', '#', '?')):
+            return True
+        else:
+            scheme, colon, rest = href.partition(':')
+            if not colon or not _SCHEME_RE.fullmatch(scheme):
+                # No scheme, so a relative reference on the same host
+                return True
+            if scheme in ('http', 'https') and rest.startswith('//'):
+                netloc = _NETLOC_END_RE.split(rest[2:], 1)[0]
+        if netloc:
+            return netloc == base_netloc
+        try:
+            return urlparse(urljoin(base_url, href)).netloc == base_netloc
+        except ValueError:
+            # Malformed URL such as an unbalanced IPv6 bracket; it can't point at our host
+            return False
+
+    def get_meta_content(self, tree, meta_name):
         """Extract meta tag content."""
         if meta_name == 'title':
-            return soup.title.string if soup.title else None
-        meta = soup.find('meta', attrs={'name': meta_name})
-        return meta['content'] if meta else None
+            values = _TITLE_XPATH(tree)
+        else:
+            values = _META_XPATH(tree, name=meta_name)
+        return values[0] if values else None
 
-    def get_canonical(self, soup):
+    def get_canonical(self, tree):
         """Get canonical URL."""
-        canonical = soup.find('link', rel='canonical')
-        return canonical['href'] if canonical else None
+        hrefs = _CANONICAL_XPATH(tree)
+        return hrefs[0] if hrefs else None
 
-    def count_headings(self, soup):
+    def count_headings(self, tag_counts):
         """Count heading tags distribution."""
-        return {f'h{i}': len(soup.find_all(f'h{i}')) for i in range(1, 7)}
+        return {f'h{i}': tag_counts[f'h{i}'] for i in range(1, 7)}
 
     def check_ssl(self, url):
         """Check if URL uses HTTPS."""
         return url.startswith('https://')
 
     def analyze_url(self, url, report_file=None):
+        start_time = time.time()
         try:
-            content = self.fetch_url_content(url)
+            tree, size = self.fetch_url_content(url)
             
-            if not content or len(content) < 100:
+            if tree is None:
                 return {
                     'error': 'Insufficient content',
                     'keywords': [],
@@ -154,25 +279,28 @@ class SEOAnalyzer:
                     'metadata': {}
                 }
             
-            soup = BeautifulSoup(content, 'lxml')
-            text = soup.get_text(separator=' ', strip=True)
+            technical_future = self._pool.submit(self.analyze_technical, url, tree)
+            links_future = self._pool.submit(self.analyze_links, url, tree)
+            text = self.get_text(tree)
+            tag_counts = self.count_tags(tree)
+            content_future = self._pool.submit(self.analyze_content, tree, text=text, tag_counts=tag_counts)
             
             cleaned_words = self.clean_text(text)
             word_freq = Counter(cleaned_words)
-            keywords = [word for word, _ in word_freq.most_common(10)]
+            keywords = [word for word, _ in heapq.nlargest(10, word_freq.items(), key=itemgetter(1))]
             
             analysis = {
                 'url': url,
                 'keywords': keywords,
-                'content': self.analyze_content(soup),
-                'technical': self.analyze_technical(url, soup),
-                'links': self.analyze_links(url, soup),
+                'content': content_future.result(),
+                'technical': technical_future.result(),
+                'links': links_future.result(),
                 'performance': {
-                    'totalResources': len(soup.find_all('script')) + len(soup.find_all('link')) + len(soup.find_all('img')),
-                    'totalSize': len(content)  # Approximate total size (could be refined further)
+                    'totalResources': tag_counts['script'] + tag_counts['link'] + tag_counts['img'],
+                    'totalSize': size
                 },
                 'metadata': {
-                    'analysisDuration': time.time() - time.time(),  # This can be adjusted to actual time taken
+                    'analysisDuration': time.time() - start_time,
                     'analyzedAt': datetime.now().isoformat()
                 }
             }
@@ -231,12 +359,4 @@ class SEOAnalyzer:
         except Exception as e:
             print(f"Error writing report: {e}")
 
-def setup():
-    initialize_nltk()
-    return SEOAnalyzer()
-
-analyzer = setup()
-
-    return SEOAnalyzer()
-
-analyzer = setup()
+analyzer = SEOAnalyzer()
@@ -1,13 +1,14 @@
 #!/bin/sh
 
-# Start the main app
-python app.py &
-
-# Start the SEO analyzer
-python seo_analyzer.py &
-
-# Wait for any process to exit
-wait -n
-
-# Exit with the status of the first process to exit
-exit $?
+# Serve the API with gunicorn: worker processes for the CPU-bound parsing,
+# threads within each worker for the I/O-bound page fetches. --preload
+# imports the app (NLTK corpus, analyzer) once in the master so workers
+# share it copy-on-write instead of each loading their own.
+exec gunicorn \
+    --preload \
+    --bind "0.0.0.0:${PORT:-8080}" \
+    --workers "${GUNICORN_WORKERS:-4}" \
+    --worker-class gthread \
+    --threads "${GUNICORN_THREADS:-16}" \
+    --timeout 60 \
+    app:app